@@ -1,12 +1,21 @@
 ﻿import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Dict, Tuple, Optional
 import json
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen; this runs headless under the Node server
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 import os
 import sys
 import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
 
 # Try to import plotly, if available
 try:
@@ -17,8 +26,170 @@ except ImportError:
     PLOTLY_AVAILABLE = False
     print("Plotly not available. Using matplotlib for visualization.", file=sys.stderr)
 
+# Try to import numba for the JIT-compiled placement search, if available
+try:
+    from numba import njit, prange, set_num_threads
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Try to import orjson for reading and writing the JSON payloads, if available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Every container grid uses the same resolution: each unit is divided into 10 cells
+GRID_RESOLUTION = 10
+
+# The occupancy grid packs the Z axis of each (x, y) column into 64-bit words
+WORD_BITS = 64
+WORD_ONES = (1 << WORD_BITS) - 1
+
+# Containers track placed boxes in a list until they hold this many items,
+# then switch to the dense occupancy grid
+DENSE_GRID_MIN_ITEMS = 64
+
+# Footprint cells compared per block when counting stacking support without
+# numba, which keeps each block's temporary arrays about L2-sized
+SEARCH_BLOCK_ELEMENTS = 1 << 15
+
+# With enforced zones, zones are packed in separate processes once there are
+# at least this many items to place. Starting a worker costs about a second
+# (it imports this module and loads the compiled kernels), and with two zones
+# the pool saves at most half of the serial time, so it only pays off for
+# packing runs that take several seconds
+PARALLEL_ZONES_MIN_ITEMS = 1000
+
+# Containers are rendered in separate processes once they hold at least this many
+# placed items. A container of about 120 items renders in about 60 ms, so below a
+# few thousand items the whole render is cheaper than starting the workers
+PARALLEL_RENDER_MIN_ITEMS = 4000
+
+# Visualization color for each priority from 1 to 10
+PRIORITY_COLORS = tuple(
+    f'rgb(220, {60 + (10-p)*15}, {40 + (10-p)*10})' if p >= 8 else  # High priority (8-10): red spectrum
+    f'rgb(220, {150 + (7-p)*15}, 30)' if p >= 4 else                # Medium priority (4-7): orange/yellow spectrum
+    f'rgb({40 + p*20}, {100 + p*20}, 220)'                           # Low priority (1-3): blue spectrum
+    for p in range(1, 11))
+
+# The container view draws items as markers instead of cuboids above this many items
+LOD_ITEM_THRESHOLD = 500
+
+# Generated pages load plotly.js from one shared copy in the backend's exports
+# directory (served at /exports) rather than each output directory getting its own
+PLOTLYJS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'exports'))
+
+# Corners of a unit cuboid (bottom face, then top face) and its 12 triangles
+# (bottom, top, front, back, left, right), scaled and offset to draw items
+UNIT_BOX = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                     [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=np.float32)
+UNIT_BOX_I = np.array([0, 0, 4, 4, 0, 0, 3, 3, 0, 0, 1, 1], dtype=np.int32)
+UNIT_BOX_J = np.array([1, 2, 5, 6, 1, 5, 2, 6, 3, 7, 2, 6], dtype=np.int32)
+UNIT_BOX_K = np.array([2, 3, 6, 7, 5, 4, 6, 7, 7, 4, 6, 5], dtype=np.int32)
+
+def configure_logging(debug: bool = False):
+    """Send this module's placement search diagnostics to stderr, but only when debugging"""
+    # Only this module's logger is configured, so libraries such as numba keep their own
+    # (quiet) levels. Worker processes may call this once per job, so the handler is added once
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if debug else logging.WARNING)
+
+def loads_json(data):
+    """Parse JSON from a str or bytes, with orjson when available"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def dumps_json(obj) -> bytes:
+    """Serialize to compact JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode()
+
+def boxes_overlap(a: Tuple[int, ...], b: Tuple[int, ...]) -> bool:
+    """Check if two (x0, y0, z0, x1, y1, z1) cell boxes share any cell"""
+    return (a[0] < b[3] and b[0] < a[3] and
+            a[1] < b[4] and b[1] < a[4] and
+            a[2] < b[5] and b[2] < a[5])
+
+@lru_cache(maxsize=None)
+def z_word_mask(z: int, height: int) -> Tuple[int, int, np.ndarray]:
+    """Get the word range and bit masks covering cells z..z+height-1 of a packed column"""
+    first_word = z // WORD_BITS
+    last_word = (z + height - 1) // WORD_BITS
+    words = [WORD_ONES] * (last_word - first_word + 1)
+    
+    # Trim the partial head and tail words
+    words[0] &= WORD_ONES << (z % WORD_BITS)
+    tail_bits = (z + height) % WORD_BITS
+    if tail_bits:
+        words[-1] &= (1 << tail_bits) - 1
+    
+    mask = np.array(words, dtype=np.uint64)
+    mask.setflags(write=False)
+    return first_word, last_word, mask
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def find_position_numba(heightmap, item_width, item_depth, x_count, z_count, y_order, required_support, tops):
+        """Find the first free floor position, else the first supported stacked one, as (x, y, z) or (-1, -1, -1)"""
+        def running_max(values, width, out):
+            # Write the max of each width-long window of values into out. Prefix maxima restart
+            # at every multiple of width and suffix maxima end at one, so each window is one
+            # suffix plus one prefix (van Herk / Gil-Werman)
+            n = values.shape[0]
+            prefix = np.empty(n, dtype=values.dtype)
+            suffix = np.empty(n, dtype=values.dtype)
+            for i in range(n):
+                prefix[i] = values[i] if i % width == 0 else max(prefix[i - 1], values[i])
+            for i in range(n - 1, -1, -1):
+                suffix[i] = values[i] if i == n - 1 or (i + 1) % width == 0 else max(suffix[i + 1], values[i])
+            for i in range(out.shape[0]):
+                out[i] = max(suffix[i], prefix[i + width - 1])
+        
+        y_count = y_order.shape[0]
+        y_span = y_count + item_depth - 1
+        
+        # The footprint max is separable: a running max along x, then one along y
+        row_tops = np.empty((x_count, y_span), dtype=heightmap.dtype)
+        for y in prange(y_span):
+            running_max(heightmap[:x_count + item_width - 1, y], item_width, row_tops[:, y])
+        for x in prange(x_count):
+            running_max(row_tops[x], item_depth, tops[x, :y_count])
+        
+        # Try all positions on the floor first (first x, then y in search order)
+        for x in range(x_count):
+            for y_index in range(y_count):
+                y = y_order[y_index]
+                if tops[x, y] == 0:
+                    return x, y, 0
+        
+        # Then stack on the first supported surface; support is only counted
+        # under the candidates that leave room below the ceiling
+        for x in range(x_count):
+            for y_index in range(y_count):
+                y = y_order[y_index]
+                top = tops[x, y]
+                if top >= z_count:
+                    continue
+                support_count = 0
+                for sx in range(x, x + item_width):
+                    for sy in range(y, y + item_depth):
+                        if heightmap[sx, sy] == top:
+                            support_count += 1
+                if support_count >= required_support:
+                    return x, y, top
+        
+        return -1, -1, -1
+
 class Item:
     """Represents a 3D item with dimensions and attributes"""
+    __slots__ = ('item_id', 'name', 'width', 'depth', 'height', 'volume', 'mass', 'priority',
+                 'expiry_date', 'preferred_zone', 'position', 'wc', 'dc', 'hc')
+    
     def __init__(self, item_id: str, name: str, width: float, depth: float, height: float, 
                  mass: float, priority: int, expiry_date: str, zone: str = None):
         self.item_id = item_id
@@ -33,12 +204,25 @@ class Item:
         self.expiry_date = expiry_date
         self.preferred_zone = zone
         self.position = None  # Will store (x, y, z) coordinates when placed
+        self.wc = self.dc = self.hc = None  # Dimensions in grid cells, computed on first use
+    
+    def cellsize(self, resolution: int) -> Tuple[int, int, int]:
+        """Get the item dimensions in grid cells (cached after the first call)"""
+        if self.wc is None:
+            self.wc = int(self.width * resolution)
+            self.dc = int(self.depth * resolution)
+            self.hc = int(self.height * resolution)
+        return self.wc, self.dc, self.hc
         
     def __repr__(self):
         return f"Item({self.item_id}, {self.width}x{self.depth}x{self.height}, p:{self.priority}, zone:{self.preferred_zone})"
 
 class Container:
     """Represents a 3D container with dimensions and a space matrix"""
+    __slots__ = ('container_id', 'width', 'depth', 'height', 'volume', 'zone', 'available_volume',
+                 'items', 'resolution', 'wc', 'dc', 'hc', 'occupied_boxes', 'space', 'heightmap',
+                 '_scratch_heights', '_scratch_mask')
+    
     def __init__(self, container_id: str, width: float, depth: float, height: float, zone: str):
         self.container_id = container_id
         # Ensure dimensions are at least 1 to avoid 0 values
@@ -52,12 +236,20 @@ class Container:
         
         # Create a 3D matrix to represent the container space
         # Resolution determines the granularity of our spatial representation
-        self.resolution = 10  # Each unit is divided into 10 cells
-        self.space = np.zeros((
-            int(self.width * self.resolution),
-            int(self.depth * self.resolution),
-            int(self.height * self.resolution)
-        ), dtype=bool)
+        self.resolution = GRID_RESOLUTION
+        self.wc = int(self.width * self.resolution)
+        self.dc = int(self.depth * self.resolution)
+        self.hc = int(self.height * self.resolution)
+        # Cell boxes of the placed items; the dense grid (one bit per cell, with
+        # the Z axis packed into 64-bit words) is only allocated once many items are placed
+        self.occupied_boxes = []
+        self.space = None
+        # Height of the top occupied cell in each (x, y) column
+        self.heightmap = np.zeros((self.wc, self.dc), dtype=np.int32)
+        # Per-candidate buffers reused by every placement search in this container
+        self._scratch_heights = np.empty((self.wc, self.dc), dtype=np.int32)
+        self._scratch_mask = np.empty((self.wc, self.dc), dtype=bool)
+    
         
     def is_position_valid(self, item: Item, position: Tuple[int, int, int]) -> bool:
         """Check if an item can be placed at the given position"""
@@ -69,24 +261,44 @@ class Container:
             return False
             
         # Check if the space is already occupied
-        item_width = int(item.width * self.resolution)
-        item_depth = int(item.depth * self.resolution)
-        item_height = int(item.height * self.resolution)
+        item_width, item_depth, item_height = item.cellsize(self.resolution)
         
-        return not np.any(self.space[x:x+item_width, y:y+item_depth, z:z+item_height])
+        candidate = (x, y, z, x + item_width, y + item_depth, z + item_height)
+        if self.space is None:
+            return not any(boxes_overlap(candidate, box) for box in self.occupied_boxes)
+        
+        first_word, last_word, mask = z_word_mask(z, item_height)
+        return not np.any(self.space[x:x+item_width, y:y+item_depth, first_word:last_word+1] & mask)
+    
+    def _mark_occupied(self, box: Tuple[int, ...]):
+        """Set the bits of a cell box in the dense grid"""
+        x0, y0, z0, x1, y1, z1 = box
+        first_word, last_word, mask = z_word_mask(z0, z1 - z0)
+        self.space[x0:x1, y0:y1, first_word:last_word+1] |= mask
     
     def place_item(self, item: Item, position: Tuple[int, int, int]) -> bool:
         """Place an item at the given position if valid"""
         if not self.is_position_valid(item, position):
             return False
-            
+        
+        return self.place_item_unchecked(item, position)
+    
+    def place_item_unchecked(self, item: Item, position: Tuple[int, int, int]) -> bool:
+        """Place an item at a position the caller has already validated"""
         x, y, z = position
-        item_width = int(item.width * self.resolution)
-        item_depth = int(item.depth * self.resolution)
-        item_height = int(item.height * self.resolution)
+        item_width, item_depth, item_height = item.cellsize(self.resolution)
         
         # Mark the space as occupied
-        self.space[x:x+item_width, y:y+item_depth, z:z+item_height] = True
+        box = (x, y, z, x + item_width, y + item_depth, z + item_height)
+        self.occupied_boxes.append(box)
+        if self.space is not None:
+            self._mark_occupied(box)
+        elif len(self.occupied_boxes) >= DENSE_GRID_MIN_ITEMS:
+            self.space = np.zeros((self.wc, self.dc, (self.hc + WORD_BITS - 1) // WORD_BITS), dtype=np.uint64)
+            for placed_box in self.occupied_boxes:
+                self._mark_occupied(placed_box)
+        footprint = self.heightmap[x:x+item_width, y:y+item_depth]
+        np.maximum(footprint, z + item_height, out=footprint)
         
         # Store the position in the item
         item.position = (x / self.resolution, y / self.resolution, z / self.resolution)
@@ -108,69 +320,121 @@ class ThreeDimensionalPacking:
     
     def __init__(self, containers: List[Container], items: List[Item], debug=False, enforce_zones=False):
         self.containers = containers
-        self.items = sorted(items, key=lambda x: (-x.priority, x.expiry_date))  # Sort by priority (desc) and expiry date
+        
+        # Group containers by zone, and order them preferred-zone-first for each zone
+        self.containers_by_zone: Dict[str, List[Container]] = {}
+        for container in containers:
+            self.containers_by_zone.setdefault(container.zone, []).append(container)
+        self.zone_container_order: Dict[str, List[Container]] = {
+            zone: zone_containers + [c for c in containers if c.zone != zone]
+            for zone, zone_containers in self.containers_by_zone.items()
+        }
+        
+        # Sort by priority (desc) and expiry date; ISO date strings sort chronologically
+        priorities = np.array([-item.priority for item in items], dtype=np.int32)
+        expiries = np.array([item.expiry_date or '' for item in items], dtype=str)
+        self.items = [items[i] for i in np.lexsort((expiries, priorities))]
         self.placements = {}  # Will store successful placements
         self.debug = debug
         self.enforce_zones = enforce_zones
         
     def find_bottom_left_back_position(self, container: Container, item: Item) -> Optional[Tuple[int, int, int]]:
         """Find the bottom-left-back position for an item (gravity-based placement with improved priority)"""
-        width_cells = int(container.width * container.resolution)
-        depth_cells = int(container.depth * container.resolution)
-        height_cells = int(container.height * container.resolution)
-        item_width = int(item.width * container.resolution)
-        item_depth = int(item.depth * container.resolution)
-        item_height = int(item.height * container.resolution)
-        
-        # First try to place the item on the floor if possible
-        floor_positions = []
+        width_cells, depth_cells, height_cells = container.wc, container.dc, container.hc
+        item_width, item_depth, item_height = item.cellsize(container.resolution)
+        
+        # Corners along each axis that keep the item's exact extent inside the container
+        x_count, y_count, z_count = (
+            np.count_nonzero(np.arange(cells - item_cells + 1) + item_size * container.resolution
+                             <= container_size * container.resolution)
+            for cells, item_cells, item_size, container_size in (
+                (width_cells, item_width, item.width, container.width),
+                (depth_cells, item_depth, item.depth, container.depth),
+                (height_cells, item_height, item.height, container.height)))
+        
+        if not (x_count and y_count and z_count):
+            logger.debug("No valid position found for %s", item.item_id)
+            return None
         
         # High priority items should be placed at the front of the container for easy access
         # Sort y positions based on item priority (lower y values = front of container)
-        y_range = range(depth_cells - item_depth + 1)
-        if item.priority > 5:  # Higher priority items first
-            y_range = sorted(y_range)  # Front of container first
+        if item.priority > 5:
+            y_order = np.arange(y_count)  # Front of container first
+            y_search = slice(None)
         else:
-            y_range = sorted(y_range, reverse=True)  # Back of container first
+            y_order = np.arange(y_count - 1, -1, -1)  # Back of container first
+            y_search = slice(None, None, -1)
+        
+        # Items rest on the highest surface under their footprint; stacked items
+        # need at least 50% of the footprint at that height
+        required_support = (item_width * item_depth) * 0.5
+        
+        if NUMBA_AVAILABLE:
+            x, y, z = find_position_numba(container.heightmap, item_width, item_depth,
+                                          x_count, z_count, y_order, required_support,
+                                          container._scratch_heights)
+            if z == 0:
+                logger.debug("Found floor position for %s at (%d, %d, %d)", item.item_id, x, y, z)
+                return (int(x), int(y), 0)
+            
+            logger.debug("No floor positions available for %s, trying stacking...", item.item_id)
+            if z > 0:
+                logger.debug("Found supported position for %s at (%d, %d, %d)", item.item_id, x, y, z)
+                return (int(x), int(y), int(z))
             
-        # Try all positions on the floor first
-        for x in range(width_cells - item_width + 1):
-            for y in y_range:
-                z = 0  # Floor level
-                if container.is_position_valid(item, (x, y, z)):
-                    # Found a valid floor position
-                    print(f"Found floor position for {item.item_id} at ({x}, {y}, {z})")
+            logger.debug("No valid position found for %s", item.item_id)
+            return None
+        
+        # Heightmap under every candidate footprint, as [x, y, dx, dy]; the per-candidate
+        # results go into the container's scratch buffers instead of fresh arrays
+        windows = sliding_window_view(container.heightmap, (item_width, item_depth))[:x_count, :y_count]
+        
+        # The footprint max is separable: a running max along x, then one along y
+        row_tops = sliding_window_view(container.heightmap[:x_count + item_width - 1], item_width, axis=0).max(axis=2)
+        tops = np.max(sliding_window_view(row_tops[:, :y_count + item_depth - 1], item_depth, axis=1), axis=2,
+                      out=container._scratch_heights[:x_count, :y_count])
+        mask = container._scratch_mask[:x_count, :y_count]
+        
+        # Try all positions on the floor first (first x, then y in search order)
+        on_floor = np.equal(tops, 0, out=mask)[:, y_search]
+        if on_floor.any():
+            x, y_index = np.unravel_index(np.argmax(on_floor), on_floor.shape)
+            x, y, z = int(x), int(y_order[y_index]), 0
+            logger.debug("Found floor position for %s at (%d, %d, %d)", item.item_id, x, y, z)
+            return (x, y, z)
+        
+        logger.debug("No floor positions available for %s, trying stacking...", item.item_id)
+        
+        # If no floor positions are available, stack on the first supported surface;
+        # support is only counted when some surface leaves room under the ceiling.
+        # Counting goes a block of candidates at a time, in search order, and stops at the
+        # first block with a hit. A block holds whole x rows when they fit the element
+        # budget, otherwise it is a run of y positions within one row
+        below_ceiling = np.less(tops, z_count, out=mask)[:, y_search]
+        ordered_tops = tops[:, y_search]
+        ordered_windows = windows[:, y_search]
+        block_candidates = max(1, SEARCH_BLOCK_ELEMENTS // (item_width * item_depth))
+        block_cols = min(y_count, block_candidates)
+        block_rows = max(1, block_candidates // y_count)
+        for x_start in range(0, x_count, block_rows):
+            for y_start in range(0, y_count, block_cols):
+                rows = slice(x_start, x_start + block_rows)
+                cols = slice(y_start, y_start + block_cols)
+                block = below_ceiling[rows, cols]
+                if not block.any():
+                    continue
+                
+                support = np.count_nonzero(ordered_windows[rows, cols] == ordered_tops[rows, cols, None, None],
+                                           axis=(2, 3))
+                block &= support >= required_support
+                if block.any():
+                    x, y_index = np.unravel_index(np.argmax(block), block.shape)
+                    x, y = x_start + int(x), int(y_order[y_start + y_index])
+                    z = int(tops[x, y])
+                    logger.debug("Found supported position for %s at (%d, %d, %d)", item.item_id, x, y, z)
                     return (x, y, z)
         
-        print(f"No floor positions available for {item.item_id}, trying stacking...")
-        
-        # If no floor positions are available, try stacking on other items
-        for x in range(width_cells - item_width + 1):
-            for y in y_range:
-                # Start from 1 (above floor) and find first valid position with support
-                for z in range(1, height_cells - item_height + 1):
-                    # Check if we can place the item here
-                    if container.is_position_valid(item, (x, y, z)):
-                        # Check if there's support below
-                        has_support = False
-                        # Calculate support percentage required (at least 50% support)
-                        required_support = (item_width * item_depth) * 0.5  
-                        
-                        # Count supported cells
-                        support_count = 0
-                        for sx in range(x, x + item_width):
-                            for sy in range(y, y + item_depth):
-                                if sx < width_cells and sy < depth_cells and z > 0 and container.space[sx, sy, z-1]:
-                                    support_count += 1
-                        
-                        if support_count >= required_support:
-                            has_support = True
-                            
-                        if has_support:
-                            print(f"Found supported position for {item.item_id} at ({x}, {y}, {z})")
-                            return (x, y, z)
-        
-        print(f"No valid position found for {item.item_id}")
+        logger.debug("No valid position found for %s", item.item_id)
         return None  # No valid position found
     
     def pack_items(self) -> Dict:
@@ -184,6 +448,92 @@ class ThreeDimensionalPacking:
             print(f"\nPACKING ALGORITHM: Starting with {len(self.items)} items to place")
             print(f"Items sorted by priority: {[(item.item_id, item.priority) for item in self.items]}")
         
+        zone_jobs = self._parallel_zone_jobs()
+        if zone_jobs:
+            self._pack_zones_in_parallel(zone_jobs, results)
+        else:
+            self._pack_items_serially(results)
+        
+        # Calculate container statistics
+        results["container_stats"] = []
+        for container in self.containers:
+            utilization_percentage = (1 - (container.available_volume / container.volume)) * 100
+            results["container_stats"].append({
+                "container_id": container.container_id,
+                "zone": container.zone,
+                "items_placed": len(container.items),
+                "volume_utilization": utilization_percentage,
+                "available_volume": container.available_volume,
+                "total_volume": container.volume
+            })
+        
+        return results
+    
+    def _parallel_zone_jobs(self) -> Dict[str, List[Item]]:
+        """Get the items of each zone to pack in its own process, or nothing if packing should stay serial"""
+        # Zones are only independent when placement is restricted to matching containers,
+        # and items with existing positions may be matched to a container of any zone
+        if (not self.enforce_zones or len(self.items) < PARALLEL_ZONES_MIN_ITEMS or
+                (os.cpu_count() or 1) < 2 or any(item.position for item in self.items)):
+            return {}
+        
+        zone_jobs = {}
+        for item in self.items:
+            if item.preferred_zone in self.containers_by_zone:
+                zone_jobs.setdefault(item.preferred_zone, []).append(item)
+        return zone_jobs if len(zone_jobs) > 1 else {}
+    
+    def _pack_zones_in_parallel(self, zone_jobs: Dict[str, List[Item]], results: Dict):
+        """Pack each zone in a worker process, then replay the placements in item order"""
+        with _process_pool(len(zone_jobs)) as executor:
+            futures = {
+                zone: executor.submit(pack_zone, self.containers_by_zone[zone], zone_items, self.debug)
+                for zone, zone_items in zone_jobs.items()
+            }
+            outcomes = {}
+            for zone, future in futures.items():
+                outcomes.update(zip(map(id, zone_jobs[zone]), future.result()))
+        
+        for item in self.items:
+            if item.preferred_zone not in self.containers_by_zone:
+                results["unplaced_items"].append({
+                    "item_id": item.item_id,
+                    "reason": f"No containers available with matching zone {item.preferred_zone}"
+                })
+                continue
+            
+            outcome = outcomes[id(item)]
+            if outcome is None:
+                results["unplaced_items"].append({
+                    "item_id": item.item_id,
+                    "reason": "No suitable position found"
+                })
+                continue
+            
+            container_index, position = outcome
+            container = self.containers_by_zone[item.preferred_zone][container_index]
+            container.place_item_unchecked(item, position)
+            results["successful_placements"].append({
+                "item_id": item.item_id,
+                "container_id": container.container_id,
+                "position": {
+                    "x": position[0]/container.resolution,
+                    "y": position[1]/container.resolution,
+                    "z": position[2]/container.resolution
+                },
+                "dimensions": {
+                    "width": item.width,
+                    "depth": item.depth,
+                    "height": item.height
+                }
+            })
+    
+    def _pack_items_serially(self, results: Dict):
+        """Place every item in turn, appending to the placement results"""
+        # Container extents, for matching items that already have a position
+        container_bounds = np.array([(c.width, c.depth, c.height) for c in self.containers],
+                                    dtype=float).reshape(-1, 3)
+        
         # First, try to place items in their preferred zones
         for item_index, item in enumerate(self.items):
             placed = False
@@ -198,30 +548,31 @@ class ThreeDimensionalPacking:
                 if self.debug:
                     print(f"  Item already has position: {item.position}")
                 
-                # Find the container by checking dimensions
-                for container in self.containers:
-                    if (item.position[0] >= 0 and item.position[0] + item.width <= container.width and
-                        item.position[1] >= 0 and item.position[1] + item.depth <= container.depth and
-                        item.position[2] >= 0 and item.position[2] + item.height <= container.height):
-                        # Add the item to the container for visualization
-                        container.items.append(item)
-                        placed = True
-                        
-                        results["successful_placements"].append({
-                            "item_id": item.item_id,
-                            "container_id": container.container_id,
-                            "position": {
-                                "x": item.position[0],
-                                "y": item.position[1],
-                                "z": item.position[2]
-                            },
-                            "dimensions": {
-                                "width": item.width,
-                                "depth": item.depth,
-                                "height": item.height
-                            }
-                        })
-                        break
+                # Find the first container whose bounds hold the item at its position
+                position = np.asarray(item.position[:3], dtype=float)
+                extent = position + (item.width, item.depth, item.height)
+                fits = (position >= 0).all() & (extent <= container_bounds).all(axis=1)
+                if fits.any():
+                    container = self.containers[int(np.argmax(fits))]
+                    
+                    # Add the item to the container for visualization
+                    container.items.append(item)
+                    placed = True
+                    
+                    results["successful_placements"].append({
+                        "item_id": item.item_id,
+                        "container_id": container.container_id,
+                        "position": {
+                            "x": item.position[0],
+                            "y": item.position[1],
+                            "z": item.position[2]
+                        },
+                        "dimensions": {
+                            "width": item.width,
+                            "depth": item.depth,
+                            "height": item.height
+                        }
+                    })
                 
                 if placed:
                     continue
@@ -232,8 +583,7 @@ class ThreeDimensionalPacking:
             
             if self.enforce_zones:
                 # Only use containers that match the preferred zone
-                matching_containers = [container for container in self.containers 
-                                      if container.zone == item.preferred_zone]
+                matching_containers = self.containers_by_zone.get(item.preferred_zone, [])
                 
                 if not matching_containers:
                     if self.debug:
@@ -245,8 +595,7 @@ class ThreeDimensionalPacking:
                     continue
             else:
                 # Try preferred zone first, but allow other zones if needed
-                matching_containers = sorted(self.containers, 
-                                           key=lambda c: 0 if c.zone == item.preferred_zone else 1)
+                matching_containers = self.zone_container_order.get(item.preferred_zone, self.containers)
         
             # Try to place the item in each matching container
             for container in matching_containers:
@@ -273,7 +622,7 @@ class ThreeDimensionalPacking:
                 position = self.find_bottom_left_back_position(container, item)
                 if position is not None:
                     # We found a valid position, place the item
-                    if container.place_item(item, position):
+                    if container.place_item_unchecked(item, position):
                         if self.debug:
                             print(f"  Item {item.item_id} placed in container {container.container_id} "
                                   f"at position ({position[0]/container.resolution}, "
@@ -309,21 +658,6 @@ class ThreeDimensionalPacking:
                     "item_id": item.item_id,
                     "reason": reason
                 })
-        
-        # Calculate container statistics
-        results["container_stats"] = []
-        for container in self.containers:
-            utilization_percentage = (1 - (container.available_volume / container.volume)) * 100
-            results["container_stats"].append({
-                "container_id": container.container_id,
-                "zone": container.zone,
-                "items_placed": len(container.items),
-                "volume_utilization": utilization_percentage,
-                "available_volume": container.available_volume,
-                "total_volume": container.volume
-            })
-        
-        return results
     
     def visualize(self, output_path: str = None):
         """Visualize the 3D placements of items in containers"""
@@ -380,53 +714,48 @@ class ThreeDimensionalPacking:
             
             fig = go.Figure()
             
+            # Wireframe segments of every container, separated by None breaks
+            wire_x, wire_y, wire_z = [], [], []
+            # Floors of every container, drawn opaque as one mesh
+            floor_x, floor_y, floor_z, floor_i, floor_j, floor_k = [], [], [], [], [], []
+            # Item cuboids of every container, batched into one mesh per priority
+            item_meshes = {}
+            
+            # Container wireframe edges
+            edges = [
+                # Bottom face
+                [0, 1], [1, 2], [2, 3], [3, 0],
+                # Top face 
+                [4, 5], [5, 6], [6, 7], [7, 4],
+                # Connecting edges
+                [0, 4], [1, 5], [2, 6], [3, 7]
+            ]
+            
             # Add each container with appropriate offset
             x_offset = 0
             for container in self.containers:
                 width = container.width
                 depth = container.depth 
                 height = container.height
-                container_id = container.container_id
                 
                 # Define container coordinates with offset
                 x = [x_offset, x_offset + width, x_offset + width, x_offset, x_offset, x_offset + width, x_offset + width, x_offset]
                 y = [0, 0, depth, depth, 0, 0, depth, depth]
                 z = [0, 0, 0, 0, height, height, height, height]
                 
-                # Add container wireframe
-                edges = [
-                    # Bottom face
-                    [0, 1], [1, 2], [2, 3], [3, 0],
-                    # Top face 
-                    [4, 5], [5, 6], [6, 7], [7, 4],
-                    # Connecting edges
-                    [0, 4], [1, 5], [2, 6], [3, 7]
-                ]
-                
                 for edge in edges:
-                    fig.add_trace(go.Scatter3d(
-                        x=[x[edge[0]], x[edge[1]]],
-                        y=[y[edge[0]], y[edge[1]]],
-                        z=[z[edge[0]], z[edge[1]]],
-                        mode='lines',
-                        line=dict(color='rgba(30, 30, 30, 0.8)', width=2),
-                        hoverinfo='none',
-                        showlegend=False
-                    ))
+                    wire_x += [x[edge[0]], x[edge[1]], None]
+                    wire_y += [y[edge[0]], y[edge[1]], None]
+                    wire_z += [z[edge[0]], z[edge[1]], None]
                 
-                # Add container faces with transparency
-                # Bottom face
-                fig.add_trace(go.Mesh3d(
-                    x=[x_offset, x_offset + width, x_offset + width, x_offset],
-                    y=[0, 0, depth, depth],
-                    z=[0, 0, 0, 0],
-                    i=[0, 0],
-                    j=[1, 2],
-                    k=[2, 3],
-                    color='rgba(180, 180, 180, 0.3)',
-                    name=f"Container {container_id} Floor",
-                    showlegend=False
-                ))
+                # Bottom face, as two triangles of the shared floor mesh
+                vertex_offset = len(floor_x)
+                floor_x += [x_offset, x_offset + width, x_offset + width, x_offset]
+                floor_y += [0, 0, depth, depth]
+                floor_z += [0, 0, 0, 0]
+                floor_i += [vertex_offset, vertex_offset]
+                floor_j += [vertex_offset + 1, vertex_offset + 2]
+                floor_k += [vertex_offset + 2, vertex_offset + 3]
                 
                 # Add items in this container
                 for item in container.items:
@@ -439,38 +768,56 @@ class ThreeDimensionalPacking:
                     # Adjust x position with container offset
                     item_x += x_offset
                     
-                    # Get color based on priority
+                    # Group by priority so each group shares one color
                     priority = item.priority if hasattr(item, 'priority') else 5
-                    color = ThreeDimensionalPacking.get_color_for_priority(priority)
+                    mesh = item_meshes.setdefault(priority, {'boxes': [], 'hovertext': []})
                     
-                    # Create 3D box for the item
-                    x0, y0, z0 = item_x, item_y, item_z
-                    x1, y1, z1 = x0 + item_width, y0 + item_depth, z0 + item_height
+                    # Create 3D box for the item as (x, y, z, width, depth, height)
+                    mesh['boxes'].append((item_x, item_y, item_z, item_width, item_depth, item_height))
                     
-                    item_vertices = [
-                        [x0, y0, z0], [x1, y0, z0], [x1, y1, z0], [x0, y1, z0],  # Bottom face
-                        [x0, y0, z1], [x1, y0, z1], [x1, y1, z1], [x0, y1, z1]   # Top face
-                    ]
-                    
-                    i = [0, 0, 0, 0, 4, 4, 0, 0, 0, 0]  # First vertex of triangle
-                    j = [1, 2, 4, 7, 5, 6, 1, 2, 3, 7]  # Second vertex of triangle
-                    k = [2, 3, 5, 3, 6, 7, 5, 6, 7, 4]  # Third vertex of triangle
-                    
-                    fig.add_trace(go.Mesh3d(
-                        x=[v[0] for v in item_vertices],
-                        y=[v[1] for v in item_vertices],
-                        z=[v[2] for v in item_vertices],
-                        i=i, j=j, k=k,
-                        opacity=0.8,
-                        color=color,
-                        name=item.name,
-                        hoverinfo="text",
-                        hovertext=f"Item: {item.name}<br>Position: ({item_x-x_offset}, {item_y}, {item_z})<br>Dimensions: {item_width}×{item_depth}×{item_height}"
-                    ))
+                    mesh['hovertext'] += [f"Item: {item.name}<br>Position: ({item_x-x_offset}, {item_y}, {item_z})<br>Dimensions: {item_width}×{item_depth}×{item_height}"] * 8
                 
                 # Move to next container position
                 x_offset += width + 50  # Add gap between containers
             
+            fig.add_trace(go.Mesh3d(
+                x=floor_x, y=floor_y, z=floor_z,
+                i=floor_i, j=floor_j, k=floor_k,
+                color='rgb(180, 180, 180)',
+                flatshading=True,
+                name="Container Floors",
+                showlegend=False
+            ))
+            
+            # All container wireframes as a single line trace
+            fig.add_trace(go.Scatter3d(
+                x=wire_x, y=wire_y, z=wire_z,
+                mode='lines',
+                line=dict(color='rgba(30, 30, 30, 0.8)', width=2),
+                hoverinfo='none',
+                showlegend=False
+            ))
+            
+            # One item mesh per priority level
+            # Coordinates and indices go in as typed arrays (written as base64 in the HTML)
+            for priority, mesh in sorted(item_meshes.items()):
+                boxes = np.array(mesh['boxes'])
+                vertices = (UNIT_BOX[None] * boxes[:, None, 3:] + boxes[:, None, :3]).astype(np.float32)
+                vertex_offsets = 8 * np.arange(len(boxes), dtype=np.int32)[:, None]
+                fig.add_trace(go.Mesh3d(
+                    x=vertices[:, :, 0].ravel(),
+                    y=vertices[:, :, 1].ravel(),
+                    z=vertices[:, :, 2].ravel(),
+                    i=(UNIT_BOX_I + vertex_offsets).ravel(),
+                    j=(UNIT_BOX_J + vertex_offsets).ravel(),
+                    k=(UNIT_BOX_K + vertex_offsets).ravel(),
+                    hovertext=mesh['hovertext'],
+                    opacity=0.8,
+                    color=ThreeDimensionalPacking.get_color_for_priority(priority),
+                    name=f"Priority {priority}",
+                    hoverinfo="text"
+                ))
+            
             # Set layout with improved camera position
             fig.update_layout(
                 scene=dict(
@@ -485,11 +832,13 @@ class ThreeDimensionalPacking:
                 ),
                 margin=dict(l=0, r=0, b=0, t=30),
                 scene_dragmode='orbit',
-                title="All Containers 3D View"
+                title="All Containers 3D View",
+                uirevision='all-containers'  # Keep the camera and GPU buffers across re-renders
             )
             
-            # Write to HTML file
-            fig.write_html(output_path)
+            # Write to HTML file; the figure was validated while it was built
+            fig.write_html(output_path, include_plotlyjs=_plotlyjs_src(output_path), include_mathjax=False,
+                           validate=False, auto_play=False)
             return True
             
         except Exception as e:
@@ -502,14 +851,7 @@ class ThreeDimensionalPacking:
     def get_color_for_priority(priority):
         """Get a color based on item priority"""
         p = int(priority) if priority is not None else 5
-        p = max(1, min(10, p))
-        
-        if p >= 8:  # High priority (8-10): red spectrum
-            return f'rgb(220, {60 + (10-p)*15}, {40 + (10-p)*10})'
-        elif p >= 4:  # Medium priority (4-7): orange/yellow spectrum
-            return f'rgb(220, {150 + (7-p)*15}, 30)'
-        else:  # Low priority (1-3): blue spectrum
-            return f'rgb({40 + p*20}, {100 + p*20}, 220)'
+        return PRIORITY_COLORS[max(1, min(10, p)) - 1]
     
     @staticmethod
     def run_packing_simulation(containers_data, items_data, output_path=None, debug=True):
@@ -612,6 +954,58 @@ class ThreeDimensionalPacking:
             
         return results
 
+def _process_pool(job_count: int) -> ProcessPoolExecutor:
+    """Get a worker pool for job_count jobs, capped at the CPU count"""
+    # Workers are spawned rather than forked: a child forked after the numba kernels have
+    # started their thread pool inherits it half-initialized and hangs on exit
+    return ProcessPoolExecutor(max_workers=min(job_count, os.cpu_count() or 1),
+                               mp_context=multiprocessing.get_context('spawn'))
+
+def pack_zone(containers: List[Container], items: List[Item], debug: bool = False) -> List[Optional[Tuple[int, Tuple[int, int, int]]]]:
+    """Pack one zone's items (in worker processes), returning each item's (container index, cell position) or None"""
+    # Zones already run side by side, so each worker keeps the numba kernels to one thread
+    # instead of starting a thread per CPU in every process
+    if NUMBA_AVAILABLE:
+        set_num_threads(1)
+    
+    # Spawned workers start with an unconfigured logger, which would drop the --debug diagnostics
+    if debug:
+        configure_logging(debug)
+    
+    # Containers may already hold items from an earlier pack, including preset-position
+    # items that have no occupied box, so only what this job appends is reported
+    starts = [(len(c.items), len(c.occupied_boxes)) for c in containers]
+    packer = ThreeDimensionalPacking(containers, items, debug=debug, enforce_zones=True)
+    packer._pack_items_serially({"successful_placements": [], "unplaced_items": []})
+    
+    # Every item of this job was placed by place_item_unchecked, so the items and
+    # occupied boxes appended to each container line up
+    item_indices = {id(item): i for i, item in enumerate(items)}
+    outcomes = [None] * len(items)
+    for container_index, (container, (item_start, box_start)) in enumerate(zip(containers, starts)):
+        for item, box in zip(container.items[item_start:], container.occupied_boxes[box_start:]):
+            outcomes[item_indices[id(item)]] = (container_index, box[:3])
+    return outcomes
+
+def _plotlyjs_src(output_path: str) -> str:
+    """Get the include_plotlyjs value for a page at output_path: a relative path to the shared plotly.js"""
+    import plotly
+    from plotly.offline import get_plotlyjs
+    
+    js_path = os.path.join(PLOTLYJS_DIR, f'plotly-{plotly.__version__}.min.js')
+    try:
+        if not os.path.exists(js_path):
+            os.makedirs(PLOTLYJS_DIR, exist_ok=True)
+            # Written under a temporary name first, so concurrent workers never load half a file
+            tmp_path = f'{js_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(get_plotlyjs())
+            os.replace(tmp_path, js_path)
+        return os.path.relpath(js_path, os.path.dirname(os.path.abspath(output_path))).replace(os.sep, '/')
+    except (OSError, ValueError):
+        # Unwritable exports directory, or a page on another drive: load plotly.js from the CDN
+        return 'cdn'
+
 def visualize_item_plotly(item: Dict, output_path: str) -> bool:
     """Create an interactive 3D visualization of a single item using Plotly"""
     if not PLOTLY_AVAILABLE:
@@ -690,12 +1084,12 @@ def visualize_item_plotly(item: Dict, output_path: str) -> bool:
             template='plotly_dark'
         )
         
-        # Save as interactive HTML
+        # Save as interactive HTML, loading plotly.js from the shared copy
         fig.write_html(
             output_path,
-            include_plotlyjs='cdn',
+            include_plotlyjs=_plotlyjs_src(output_path),
             full_html=True,
-            include_mathjax='cdn'
+            include_mathjax=False
         )
         
         print(f"Interactive 3D visualization created at: {output_path}")
@@ -705,7 +1099,297 @@ def visualize_item_plotly(item: Dict, output_path: str) -> bool:
         print(f"Error creating Plotly visualization: {e}", file=sys.stderr)
         return False
 
-def visualize_container_plotly(container, items, output_path):
+class _ItemView:
+    """Uniform view of an Item object or item dict, with the attributes the visualizations draw"""
+    __slots__ = ('item_id', 'name', 'width', 'depth', 'height', 'x', 'y', 'z', 'priority')
+    
+    def __init__(self, item, idx: int):
+        # Handle different item types (object or dict)
+        self.item_id = item.item_id if hasattr(item, 'item_id') else item.get('itemId', f'Item-{idx}')
+        self.name = item.name if hasattr(item, 'name') else item.get('name', self.item_id)
+        
+        # Get dimensions
+        if hasattr(item, 'width'):
+            dims = (item.width, item.depth, item.height)
+        else:
+            dims = item.get('dimensions', {})
+            if isinstance(dims, dict):
+                dims = (dims.get('width', 50), dims.get('depth', 50), dims.get('height', 50))
+        self.width, self.depth, self.height = (float(d) for d in dims[:3])
+        
+        # Get priority for coloring
+        priority = item.priority if hasattr(item, 'priority') else item.get('priority', 5)
+        self.priority = 5 if priority is None else int(priority)
+        
+        # Get position
+        if hasattr(item, 'position') and item.position:
+            position = item.position
+        elif isinstance(item, dict) and 'position' in item:
+            position = item['position']
+            if isinstance(position, dict):
+                position = (position.get('x', 0), position.get('y', 0), position.get('z', 0))
+        else:
+            position = (0, 0, 0)
+        self.x, self.y = float(position[0]), float(position[1])
+        self.z = float(position[2]) if len(position) > 2 else 0.0
+
+def _items_to_arrays(items) -> Dict[str, np.ndarray]:
+    """Collect the position, dimensions, priority and label of Item objects or item dicts as columns"""
+    views = [_ItemView(item, idx) for idx, item in enumerate(items)]
+    
+    xs, ys, zs, widths, depths, heights = np.array(
+        [(v.x, v.y, v.z, v.width, v.depth, v.height) for v in views], dtype=float).reshape(-1, 6).T
+    return {
+        'xs': xs, 'ys': ys, 'zs': zs,
+        'widths': widths, 'depths': depths, 'heights': heights,
+        'priorities': np.array([v.priority for v in views], dtype=int),
+        'names': [v.name for v in views]
+    }
+
+def _exterior_item_mask(columns: Dict[str, np.ndarray], container_size: Tuple[float, float, float]) -> np.ndarray:
+    """Flag the items that can be seen from outside, leaving out those enclosed on all 6 sides by other items"""
+    item_count = len(columns['names'])
+    visible = np.ones(item_count, dtype=bool)
+    if item_count == 0:
+        return visible
+    
+    lows = np.stack([columns['xs'], columns['ys'], columns['zs']], axis=1)
+    sizes = np.stack([columns['widths'], columns['depths'], columns['heights']], axis=1)
+    
+    # Coarse voxels (a quarter of the smallest item side, at most 256 per axis); a voxel
+    # is occupied when its center lies inside an item
+    pitch = max(float(sizes.min()) / 4, max(container_size) / 256)
+    if pitch <= 0:
+        return visible
+    shape = tuple(max(1, int(np.ceil(size / pitch))) for size in container_size)
+    first = np.ceil(lows / pitch - 0.5).astype(int)
+    stop = np.ceil((lows + sizes) / pitch - 0.5).astype(int)
+    
+    occupied = np.zeros(shape, dtype=bool)
+    for (x0, y0, z0), (x1, y1, z1) in zip(np.maximum(first, 0), stop):
+        occupied[x0:x1, y0:y1, z0:z1] = True
+    
+    # An item is hidden when the voxel layer just outside each face lies inside the
+    # container and is fully occupied; items against the walls always stay visible
+    for idx in range(item_count):
+        span = [slice(max(first[idx, axis], 0), stop[idx, axis]) for axis in range(3)]
+        if any(s.start >= s.stop for s in span):
+            continue
+        
+        hidden = True
+        for axis in range(3):
+            for layer in (first[idx, axis] - 1, stop[idx, axis]):
+                if not 0 <= layer < shape[axis]:
+                    hidden = False
+                    break
+                face = list(span)
+                face[axis] = layer
+                if not occupied[tuple(face)].all():
+                    hidden = False
+                    break
+            if not hidden:
+                break
+        visible[idx] = not hidden
+    
+    return visible
+
+# Figure settings shared by every container view
+CONTAINER_ANNOTATION_STYLE = dict(
+    x=0.5, y=0.01,
+    xref="paper", yref="paper",
+    showarrow=False,
+    font=dict(size=14, color="white"),
+    bgcolor="rgba(0,0,0,0.7)",
+    bordercolor="white",
+    borderwidth=1,
+    borderpad=6
+)
+
+CONTAINER_AXIS_STYLE = dict(
+    showbackground=True,
+    backgroundcolor="rgba(0,0,0,0.2)",
+    gridcolor="rgba(100,100,100,0.3)",
+    showspikes=False
+)
+
+CONTAINER_SCENE_STYLE = dict(
+    aspectmode='manual',
+    aspectratio=dict(
+        x=1, y=1, z=1  # Equal aspect ratio ensures proper 3D perspective
+    ),
+    camera=dict(
+        eye=dict(x=1.5, y=1.5, z=0.8),  # Better default viewing angle
+        up=dict(x=0, y=0, z=1)
+    )
+)
+
+CONTAINER_TITLE_STYLE = dict(font=dict(size=24, color='white'), x=0.5, xanchor='center')
+
+CONTAINER_LAYOUT = dict(
+    legend=dict(
+        yanchor="top",
+        y=0.99,
+        xanchor="left",
+        x=0.01,
+        bgcolor="rgba(0,0,0,0.7)",
+        bordercolor="white",
+        font=dict(color="white"),
+        borderwidth=1
+    ),
+    margin=dict(l=0, r=0, b=0, t=40),
+    template='plotly_dark',
+    paper_bgcolor='rgba(20,20,20,1)',
+    plot_bgcolor='rgba(20,20,20,1)',
+    height=800,  # Larger figure for better visibility
+    width=1000,
+    uirevision='container'  # Keep the camera and GPU buffers across re-renders
+)
+
+CONTAINER_HTML_CONFIG = {
+    'displayModeBar': True,  # Show the mode bar for basic rotation controls
+    'editable': False,
+    'modeBarButtonsToRemove': ['resetCameraLastSave', 'resetCameraDefault', 'hoverClosest3d'],
+    'toImageButtonOptions': {
+        'format': 'png',
+        'filename': 'container',
+        'height': 800,
+        'width': 1000,
+        'scale': 2
+    },
+    'displaylogo': False,
+    'scrollZoom': True,  # Enable scroll zoom
+    'responsive': True
+}
+
+@lru_cache(maxsize=32)
+def _container_shell_traces(width: float, depth: float, height: float) -> tuple:
+    """Build the traces that depend only on the container size: floor grid, floor, height markers, wireframe and dimensions"""
+    import plotly.graph_objects as go
+    
+    traces = []
+    
+    # Create a larger floor grid for better scaling and visibility
+    grid_spacing = min(width, depth) / 10
+    grid_x = np.arange(0, width + grid_spacing, grid_spacing)
+    grid_y = np.arange(0, depth + grid_spacing, grid_spacing)
+    
+    # Draw grid lines on floor as a single trace, separated by None breaks
+    grid_line_x, grid_line_y, grid_line_z = [], [], []
+    for x_val in grid_x:
+        grid_line_x += [x_val, x_val, None]
+        grid_line_y += [grid_y[0], grid_y[-1], None]
+        grid_line_z += [0, 0, None]
+        
+    for y_val in grid_y:
+        grid_line_x += [grid_x[0], grid_x[-1], None]
+        grid_line_y += [y_val, y_val, None]
+        grid_line_z += [0, 0, None]
+    
+    traces.append(go.Scatter3d(
+        x=grid_line_x,
+        y=grid_line_y,
+        z=grid_line_z,
+        mode='lines',
+        line=dict(color='rgba(150, 150, 150, 0.4)', width=1),
+        hoverinfo='none',
+        showlegend=False
+    ))
+    
+    # Only the floor is drawn as a surface; the walls are shown by the wireframe
+    # Define container coordinates
+    x = [0, width, width, 0, 0, width, width, 0]
+    y = [0, 0, depth, depth, 0, 0, depth, depth]
+    z = [0, 0, 0, 0, height, height, height, height]
+    
+    # Bottom face (floor), opaque so the browser needs no blending or depth sort for it
+    traces.append(go.Mesh3d(
+        x=[0, width, width, 0],
+        y=[0, 0, depth, depth],
+        z=[0, 0, 0, 0],
+        i=[0, 0],
+        j=[1, 2],
+        k=[2, 3],
+        color='rgb(180, 180, 180)',
+        flatshading=True,
+        name="Container Floor",
+        showlegend=False
+    ))
+    
+    # Add dimension markers
+    # Height markers on container walls for better perception, as one trace
+    marker_x, marker_y, marker_z = [], [], []
+    for h in range(0, int(height) + 1, max(1, int(height / 5))):
+        marker_x += [0, width, width, 0, 0, None]
+        marker_y += [0, 0, depth, depth, 0, None]
+        marker_z += [h, h, h, h, h, None]
+    
+    traces.append(go.Scatter3d(
+        x=marker_x,
+        y=marker_y,
+        z=marker_z,
+        mode='lines',
+        line=dict(color='rgba(100, 100, 100, 0.6)', width=1.5),
+        hoverinfo='none',
+        showlegend=False
+    ))
+    
+    # Container wireframe with thicker, more visible lines, and the dimension
+    # lines below it, as one trace with None breaks and per-point colors
+    edges = [
+        # Bottom face
+        [0, 1], [1, 2], [2, 3], [3, 0],
+        # Top face 
+        [4, 5], [5, 6], [6, 7], [7, 4],
+        # Connecting edges
+        [0, 4], [1, 5], [2, 6], [3, 7]
+    ]
+    
+    wire_x, wire_y, wire_z, wire_colors = [], [], [], []
+    for edge in edges:
+        wire_x += [x[edge[0]], x[edge[1]], None]
+        wire_y += [y[edge[0]], y[edge[1]], None]
+        wire_z += [z[edge[0]], z[edge[1]], None]
+        wire_colors += ['rgba(30, 30, 30, 0.9)'] * 3
+    
+    # Add dimension lines and labels
+    dimension_lines = [
+        ([0, width], [0, 0], [-5, -5], 'red', f'Width: {width}'),    # X-axis dimension line
+        ([0, 0], [0, depth], [-5, -5], 'green', f'Depth: {depth}'),  # Y-axis dimension line
+        ([0, 0], [-5, -5], [0, height], 'blue', f'Height: {height}') # Z-axis dimension line
+    ]
+    for line_x, line_y, line_z, color, _ in dimension_lines:
+        wire_x += line_x + [None]
+        wire_y += line_y + [None]
+        wire_z += line_z + [None]
+        wire_colors += [color] * 3
+    
+    traces.append(go.Scatter3d(
+        x=wire_x,
+        y=wire_y,
+        z=wire_z,
+        mode='lines',
+        line=dict(color=wire_colors, width=3),
+        hoverinfo='none',
+        showlegend=False
+    ))
+    
+    # Dimension labels at the far end of each dimension line
+    traces.append(go.Scatter3d(
+        x=[line[0][1] for line in dimension_lines],
+        y=[line[1][1] for line in dimension_lines],
+        z=[line[2][1] for line in dimension_lines],
+        mode='text',
+        text=[line[4] for line in dimension_lines],
+        textposition='middle right',
+        hoverinfo='none',
+        showlegend=False
+    ))
+    
+    # Figures copy the traces they are given, so the cached ones are never modified
+    return tuple(traces)
+
+def visualize_container_plotly(container, items, output_path, cull_hidden: bool = False,
+                               lod_threshold: int = LOD_ITEM_THRESHOLD, use_cache: bool = True):
     """Create an interactive 3D visualization of a container and its items using Plotly"""
     try:
         import plotly.graph_objects as go
@@ -728,286 +1412,82 @@ def visualize_container_plotly(container, items, output_path):
             subplot_titles=[f'Container {container_id} ({width} × {depth} × {height})']
         )
         
-        # Create a larger floor grid for better scaling and visibility
-        grid_spacing = min(width, depth) / 10
-        grid_x = np.arange(0, width + grid_spacing, grid_spacing)
-        grid_y = np.arange(0, depth + grid_spacing, grid_spacing)
-        grid_z = [0] * len(grid_x)  # Floor level
-        
-        # Draw grid lines on floor
-        for i, x_val in enumerate(grid_x):
-            fig.add_trace(go.Scatter3d(
-                x=[x_val] * len(grid_y),
-                y=grid_y,
-                z=grid_z,
-                mode='lines',
-                line=dict(color='rgba(150, 150, 150, 0.4)', width=1),
-                hoverinfo='none',
-                showlegend=False
-            ))
-            
-        for i, y_val in enumerate(grid_y):
-            fig.add_trace(go.Scatter3d(
-                x=grid_x,
-                y=[y_val] * len(grid_x),
-                z=grid_z,
-                mode='lines',
-                line=dict(color='rgba(150, 150, 150, 0.4)', width=1),
-                hoverinfo='none',
-                showlegend=False
-            ))
-        
-        # Create visible container surfaces for all 6 faces
-        # Define container coordinates
-        x = [0, width, width, 0, 0, width, width, 0]
-        y = [0, 0, depth, depth, 0, 0, depth, depth]
-        z = [0, 0, 0, 0, height, height, height, height]
-        
-        # Bottom face (floor)
-        fig.add_trace(go.Mesh3d(
-            x=[0, width, width, 0],
-            y=[0, 0, depth, depth],
-            z=[0, 0, 0, 0],
-            i=[0, 0],
-            j=[1, 2],
-            k=[2, 3],
-            color='rgba(180, 180, 180, 0.4)',
-            name="Container Floor",
-            showlegend=False
-        ))
-        
-        # Front face (y=0)
-        fig.add_trace(go.Mesh3d(
-            x=[0, width, width, 0],
-            y=[0, 0, 0, 0],
-            z=[0, 0, height, height],
-            i=[0, 0],
-            j=[1, 2],
-            k=[2, 3],
-            color='rgba(150, 180, 220, 0.2)',
-            name="Container Front",
-            showlegend=False
-        ))
-        
-        # Back face (y=depth)
-        fig.add_trace(go.Mesh3d(
-            x=[0, width, width, 0],
-            y=[depth, depth, depth, depth],
-            z=[0, 0, height, height],
-            i=[0, 0],
-            j=[1, 2],
-            k=[2, 3],
-            color='rgba(150, 180, 220, 0.2)',
-            name="Container Back",
-            showlegend=False
-        ))
-        
-        # Left face (x=0)
-        fig.add_trace(go.Mesh3d(
-            x=[0, 0, 0, 0],
-            y=[0, depth, depth, 0],
-            z=[0, 0, height, height],
-            i=[0, 0],
-            j=[1, 2],
-            k=[2, 3],
-            color='rgba(150, 180, 220, 0.2)',
-            name="Container Left",
-            showlegend=False
-        ))
-        
-        # Right face (x=width)
-        fig.add_trace(go.Mesh3d(
-            x=[width, width, width, width],
-            y=[0, depth, depth, 0],
-            z=[0, 0, height, height],
-            i=[0, 0],
-            j=[1, 2],
-            k=[2, 3],
-            color='rgba(150, 180, 220, 0.2)',
-            name="Container Right",
-            showlegend=False
-        ))
-        
-        # Top face (optional, can be commented out for better visibility)
-        fig.add_trace(go.Mesh3d(
-            x=[0, width, width, 0],
-            y=[0, 0, depth, depth],
-            z=[height, height, height, height],
-            i=[0, 0],
-            j=[1, 2],
-            k=[2, 3],
-            color='rgba(150, 180, 220, 0.1)',
-            opacity=0.1,
-            name="Container Top",
-            showlegend=False
-        ))
-        
-        # Add dimension markers
-        # Height markers on container walls for better perception
-        for h in range(0, int(height) + 1, max(1, int(height / 5))):
-            fig.add_trace(go.Scatter3d(
-                x=[0, width, width, 0, 0],
-                y=[0, 0, depth, depth, 0],
-                z=[h, h, h, h, h],
-                mode='lines',
-                line=dict(color='rgba(100, 100, 100, 0.6)', width=1.5),
-                hoverinfo='none',
-                showlegend=False
-            ))
-        
-        # Container wireframe with thicker, more visible lines
-        edges = [
-            # Bottom face
-            [0, 1], [1, 2], [2, 3], [3, 0],
-            # Top face 
-            [4, 5], [5, 6], [6, 7], [7, 4],
-            # Connecting edges
-            [0, 4], [1, 5], [2, 6], [3, 7]
+        # Floor grid, floor, height markers, wireframe and dimension lines, reused
+        # for containers of the same size unless caching is turned off
+        build_shell = _container_shell_traces if use_cache else _container_shell_traces.__wrapped__
+        fig.add_traces(list(build_shell(width, depth, height)))
+        
+        # Item attributes as columns, sorted by z-position for better rendering (bottom to top)
+        columns = _items_to_arrays(items)
+        order = np.argsort(columns['zs'], kind='stable')
+        
+        # Optionally leave out the items that are enclosed by others and cannot be seen
+        if cull_hidden:
+            order = order[_exterior_item_mask(columns, (width, depth, height))[order]]
+            print(f"Drawing {len(order)} of {len(items)} items after hiding enclosed items")
+        
+        xs, ys, zs = columns['xs'][order], columns['ys'][order], columns['zs'][order]
+        widths, depths, heights = columns['widths'][order], columns['depths'][order], columns['heights'][order]
+        priorities = columns['priorities'][order]
+        names = [columns['names'][idx] for idx in order]
+        
+        item_count = len(order)
+        
+        # Priority colors come straight from the color table
+        item_colors = np.array(PRIORITY_COLORS)[np.clip(priorities, 1, 10) - 1]
+        item_hover_texts = [
+            f"Item: {item_name}<br>Position: ({item_x}, {item_y}, {item_z})<br>Dimensions: {item_width}×{item_depth}×{item_height}<br>Priority: {priority}"
+            for item_name, item_x, item_y, item_z, item_width, item_depth, item_height, priority in zip(
+                names, xs, ys, zs, widths, depths, heights, priorities)
         ]
         
-        for edge in edges:
+        if item_count > lod_threshold:
+            # Large scenes: every item is one marker at its center, sized by the cube root of
+            # its volume relative to the container (~400px for the container's longest side)
+            marker_sizes = np.clip(np.cbrt(widths * depths * heights) / max(width, depth, height) * 400, 2, 40)
             fig.add_trace(go.Scatter3d(
-                x=[x[edge[0]], x[edge[1]]],
-                y=[y[edge[0]], y[edge[1]]],
-                z=[z[edge[0]], z[edge[1]]],
-                mode='lines',
-                line=dict(color='rgba(30, 30, 30, 0.9)', width=3),
-                hoverinfo='none',
+                x=(xs + widths/2).astype(np.float32),
+                y=(ys + depths/2).astype(np.float32),
+                z=(zs + heights/2).astype(np.float32),
+                mode='markers',
+                marker=dict(size=marker_sizes.astype(np.float32), color=item_colors.tolist(), opacity=0.85),
+                name="Items",
+                hoverinfo="text",
+                hovertext=item_hover_texts,
                 showlegend=False
             ))
-        
-        # Add dimension lines and labels
-        # X-axis dimension line
-        fig.add_trace(go.Scatter3d(
-            x=[0, width],
-            y=[0, 0],
-            z=[-5, -5],
-            mode='lines+text',
-            line=dict(color='red', width=3),
-            text=['', f'Width: {width}'],
-            textposition='middle right',
-            hoverinfo='none',
-            showlegend=False
-        ))
-        
-        # Y-axis dimension line
-        fig.add_trace(go.Scatter3d(
-            x=[0, 0],
-            y=[0, depth],
-            z=[-5, -5],
-            mode='lines+text',
-            line=dict(color='green', width=3),
-            text=['', f'Depth: {depth}'],
-            textposition='middle right',
-            hoverinfo='none',
-            showlegend=False
-        ))
-        
-        # Z-axis dimension line
-        fig.add_trace(go.Scatter3d(
-            x=[0, 0],
-            y=[-5, -5],
-            z=[0, height],
-            mode='lines+text',
-            line=dict(color='blue', width=3),
-            text=['', f'Height: {height}'],
-            textposition='middle right',
-            hoverinfo='none',
-            showlegend=False
-        ))
-        
-        # Sort items by position for better rendering
-        sorted_items = []
-        for item in items:
-            # Handle different item types (object or dict)
-            if hasattr(item, 'position') and item.position:
-                z_pos = item.position[2] if len(item.position) > 2 else 0
-                sorted_items.append((item, z_pos))
-            elif isinstance(item, dict) and 'position' in item:
-                if isinstance(item['position'], dict):
-                    z_pos = float(item['position'].get('z', 0))
-                else:
-                    z_pos = float(item['position'][2]) if len(item['position']) > 2 else 0
-                sorted_items.append((item, z_pos))
-            else:
-                sorted_items.append((item, 0))
-                
-        # Sort by z-position for better rendering (bottom to top)
-        sorted_items.sort(key=lambda x: x[1])
-        
-        # Add each item with enhanced 3D representation
-        for idx, (item, _) in enumerate(sorted_items):
-            # Extract item details based on type
-            item_id = item.item_id if hasattr(item, 'item_id') else item.get('itemId', f'Item-{idx}')
-            item_name = item.name if hasattr(item, 'name') else item.get('name', item_id)
-            
-            # Get dimensions
-            if hasattr(item, 'width'):
-                item_width = item.width
-                item_depth = item.depth
-                item_height = item.height
-            else:
-                item_width = float(item.get('dimensions', {}).get('width', 50))
-                item_depth = float(item.get('dimensions', {}).get('depth', 50))
-                item_height = float(item.get('dimensions', {}).get('height', 50))
-            
-            # Get priority for coloring
-            priority = item.priority if hasattr(item, 'priority') else item.get('priority', 5)
-                
-                # Get position
-            if hasattr(item, 'position') and item.position:
-                item_x, item_y, item_z = item.position
-            elif isinstance(item, dict) and 'position' in item:
-                if isinstance(item['position'], dict):
-                    item_x = float(item['position'].get('x', 0))
-                    item_y = float(item['position'].get('y', 0))
-                    item_z = float(item['position'].get('z', 0))
-                else:
-                    item_x = float(item['position'][0])
-                    item_y = float(item['position'][1])
-                    item_z = float(item['position'][2]) if len(item['position']) > 2 else 0
-            else:
-                item_x, item_y, item_z = 0, 0, 0
-                
-            # Get color based on priority
-            color = ThreeDimensionalPacking.get_color_for_priority(priority)
-            
-            # Create 3D box for each item (with all 6 faces)
-            # Define vertices
-            x0, y0, z0 = item_x, item_y, item_z
-            x1, y1, z1 = x0 + item_width, y0 + item_depth, z0 + item_height
-            
-            # Add cuboid as a mesh3d with multiple faces
-            item_vertices = [
-                [x0, y0, z0], [x1, y0, z0], [x1, y1, z0], [x0, y1, z0],  # Bottom face
-                [x0, y0, z1], [x1, y0, z1], [x1, y1, z1], [x0, y1, z1]   # Top face
-            ]
+        elif item_count:
+            # Every item cuboid goes into one mesh: 8 corners (bottom face, then top face)
+            # and 12 triangles per item, with the corners colored by the item's priority
+            origins = np.stack([xs, ys, zs])
+            sizes = np.stack([widths, depths, heights])
+            mesh_x, mesh_y, mesh_z = (UNIT_BOX.T[:, None, :] * sizes[:, :, None] +
+                                      origins[:, :, None]).reshape(3, -1).astype(np.float32)
             
-            # Define triangular faces
-            i = [0, 0, 0, 0, 4, 4, 0, 0, 0, 0]  # First vertex of triangle
-            j = [1, 2, 4, 7, 5, 6, 1, 2, 3, 7]  # Second vertex of triangle
-            k = [2, 3, 5, 3, 6, 7, 5, 6, 7, 4]  # Third vertex of triangle
+            vertex_offsets = 8 * np.arange(item_count, dtype=np.int32)[:, None]
+            mesh_i = (UNIT_BOX_I + vertex_offsets).ravel()
+            mesh_j = (UNIT_BOX_J + vertex_offsets).ravel()
+            mesh_k = (UNIT_BOX_K + vertex_offsets).ravel()
             
-            # Add item as 3D solid
+            # Add all items as one 3D solid
             fig.add_trace(go.Mesh3d(
-                x=[v[0] for v in item_vertices],
-                y=[v[1] for v in item_vertices],
-                z=[v[2] for v in item_vertices],
-                i=i, j=j, k=k,
+                x=mesh_x, y=mesh_y, z=mesh_z,
+                i=mesh_i, j=mesh_j, k=mesh_k,
                 opacity=0.8,
-                color=color,
-                name=item_name,
+                vertexcolor=np.repeat(item_colors, 8).tolist(),
+                flatshading=True,
+                name="Items",
                 hoverinfo="text",
-                hovertext=f"Item: {item_name}<br>Position: ({item_x}, {item_y}, {item_z})<br>Dimensions: {item_width}×{item_depth}×{item_height}<br>Priority: {priority}"
+                hovertext=[text for text in item_hover_texts for _ in range(8)]
             ))
             
-            # Add a text label for each item
+            # Add the text labels of all items, slightly above each item
             fig.add_trace(go.Scatter3d(
-                x=[x0 + item_width/2],
-                y=[y0 + item_depth/2],
-                z=[z1 + 2],  # Slightly above the item
+                x=(xs + widths/2).astype(np.float32),
+                y=(ys + depths/2).astype(np.float32),
+                z=(zs + heights + 2).astype(np.float32),
                 mode='text',
-                text=[item_name],
+                text=names,
                 textposition='top center',
                 textfont=dict(size=10, color='white'),
                 hoverinfo='none',
@@ -1016,27 +1496,13 @@ def visualize_container_plotly(container, items, output_path):
         
         # Calculate container utilization
         total_volume = width * depth * height
-        used_volume = 0
-        
-        for item in items:
-            if hasattr(item, 'width') and hasattr(item, 'depth') and hasattr(item, 'height'):
-                used_volume += item.width * item.depth * item.height
-            elif isinstance(item, dict) and 'dimensions' in item:
-                dims = item['dimensions']
-                if isinstance(dims, dict):
-                    used_volume += float(dims.get('width', 0)) * float(dims.get('depth', 0)) * float(dims.get('height', 0))
-                elif isinstance(dims, (list, tuple)):
-                    used_volume += (
-                        float(dims[0] if len(dims) > 0 else 0) *
-                        float(dims[1] if len(dims) > 1 else 0) *
-                        float(dims[2] if len(dims) > 2 else 0)
-                    )
+        used_volume = float((columns['widths'] * columns['depths'] * columns['heights']).sum())
         
         utilization_percent = (used_volume / total_volume * 100) if total_volume > 0 else 0
         
         # Add legend for priority colors
         for p in [1, 5, 10]:
-            color = ThreeDimensionalPacking.get_color_for_priority(p)
+            color = PRIORITY_COLORS[p - 1]
             fig.add_trace(go.Scatter3d(
                 x=[None], y=[None], z=[None],
                 mode='markers',
@@ -1047,99 +1513,34 @@ def visualize_container_plotly(container, items, output_path):
         
         # Add clearer annotations for dimensions and utilization
         fig.add_annotation(
-            x=0.5, y=0.01,
-            xref="paper", yref="paper",
             text=f"Container Dimensions: {width} × {depth} × {height} | Utilization: {utilization_percent:.1f}% | Items: {len(items)}",
-            showarrow=False,
-            font=dict(size=14, color="white"),
-            bgcolor="rgba(0,0,0,0.7)",
-            bordercolor="white",
-            borderwidth=1,
-            borderpad=6,
-            borderradius=5
+            **CONTAINER_ANNOTATION_STYLE
         )
         
-        # Update layout with improved settings for rotation-focused view
+        # Update layout with improved settings for rotation-focused view; only the
+        # axis ranges (with extra space for dimension labels) and title vary per container
         fig.update_layout(
             scene=dict(
-                xaxis=dict(
-                    title='Width',
-                    range=[-width*0.2, width*1.2],  # Add extra space for dimension labels
-                    showbackground=True,
-                    backgroundcolor="rgba(0,0,0,0.2)",
-                    gridcolor="rgba(100,100,100,0.3)",
-                    showspikes=False
-                ),
-                yaxis=dict(
-                    title='Depth',
-                    range=[-depth*0.2, depth*1.2],  # Add extra space for dimension labels
-                    showbackground=True,
-                    backgroundcolor="rgba(0,0,0,0.2)",
-                    gridcolor="rgba(100,100,100,0.3)",
-                    showspikes=False
-                ),
-                zaxis=dict(
-                    title='Height',
-                    range=[-10, height*1.2],  # Add extra space for dimension labels
-                    showbackground=True,
-                    backgroundcolor="rgba(0,0,0,0.2)",
-                    gridcolor="rgba(100,100,100,0.3)",
-                    showspikes=False
-                ),
-                aspectmode='manual',
-                aspectratio=dict(
-                    x=1, y=1, z=1  # Equal aspect ratio ensures proper 3D perspective
-                ),
-                camera=dict(
-                    eye=dict(x=1.5, y=1.5, z=0.8),  # Better default viewing angle
-                    up=dict(x=0, y=0, z=1)
-                )
+                xaxis=dict(title='Width', range=[-width*0.2, width*1.2], **CONTAINER_AXIS_STYLE),
+                yaxis=dict(title='Depth', range=[-depth*0.2, depth*1.2], **CONTAINER_AXIS_STYLE),
+                zaxis=dict(title='Height', range=[-10, height*1.2], **CONTAINER_AXIS_STYLE),
+                **CONTAINER_SCENE_STYLE
             ),
-            legend=dict(
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor="rgba(0,0,0,0.7)",
-                bordercolor="white",
-                font=dict(color="white"),
-                borderwidth=1
-            ),
-            margin=dict(l=0, r=0, b=0, t=40),
-            template='plotly_dark',
-            paper_bgcolor='rgba(20,20,20,1)',
-            plot_bgcolor='rgba(20,20,20,1)',
-            height=800,  # Larger figure for better visibility
-            width=1000,
-            title=dict(
-                text=f'Container {container_id}',
-                font=dict(size=24, color='white'),
-                x=0.5,
-                xanchor='center'
-            )
+            title=dict(text=f'Container {container_id}', **CONTAINER_TITLE_STYLE),
+            **CONTAINER_LAYOUT
         )
         
-        # Save as interactive HTML with focus on rotation
+        # Save as interactive HTML with focus on rotation, loading plotly.js from the shared copy;
+        # the figure was validated while it was built
         fig.write_html(
             output_path,
-            include_plotlyjs='cdn',
+            include_plotlyjs=_plotlyjs_src(output_path),
             full_html=True,
-            include_mathjax='cdn',
-            config={
-                'displayModeBar': True,  # Show the mode bar for basic rotation controls
-                'editable': False,
-                'modeBarButtonsToRemove': ['resetCameraLastSave', 'resetCameraDefault', 'hoverClosest3d'],
-                'toImageButtonOptions': {
-                    'format': 'png',
-                    'filename': f'container_{container_id}',
-                    'height': 800,
-                    'width': 1000,
-                    'scale': 2
-                },
-                'displaylogo': False,
-                'scrollZoom': True,  # Enable scroll zoom
-                'responsive': True
-            }
+            include_mathjax=False,
+            validate=False,
+            auto_play=False,
+            config=dict(CONTAINER_HTML_CONFIG, toImageButtonOptions=dict(
+                CONTAINER_HTML_CONFIG['toImageButtonOptions'], filename=f'container_{container_id}'))
         )
         
         print(f"Container visualization created at: {output_path}")
@@ -1182,9 +1583,10 @@ def visualize_container(container, output_path):
         container_box = Poly3DCollection(container_verts, alpha=0.2, facecolor='gray', edgecolor='black', linewidth=1)
         ax.add_collection3d(container_box)
         
-        # Plot each item in the container
+        # Plot each item in the container; all item faces go into one collection
         if hasattr(container, 'items'):
             colors = plt.cm.jet(np.linspace(0, 1, len(container.items)))
+            item_faces, face_colors = [], []
             
             for j, item in enumerate(container.items):
                 if hasattr(item, 'position') and item.position:
@@ -1203,13 +1605,17 @@ def visualize_container(container, output_path):
                     ]
                     
                     # Add item as a colored box
-                    item_box = Poly3DCollection(item_verts, alpha=0.8, facecolor=colors[j], edgecolor='black', linewidth=0.5)
-                    ax.add_collection3d(item_box)
+                    item_faces += item_verts
+                    face_colors += [colors[j]] * len(item_verts)
                     
                     # Add item label
                     ax.text(x + w/2, y + d/2, z + h/2, 
                             item.item_id if hasattr(item, 'item_id') else f"Item {j+1}", 
                             color='black', fontsize=8, ha='center', va='center')
+            
+            if item_faces:
+                item_boxes = Poly3DCollection(item_faces, alpha=0.8, facecolors=face_colors, edgecolor='black', linewidth=0.5)
+                ax.add_collection3d(item_boxes)
         
         # Set plot limits and labels
         ax.set_xlim([0, width])
@@ -1221,7 +1627,7 @@ def visualize_container(container, output_path):
         ax.set_title(f'Container {container_id}')
         
         # Save the figure
-        plt.savefig(output_path)
+        plt.savefig(output_path, dpi=100, bbox_inches='tight')
         plt.close(fig)
         
         print(f"Fallback container visualization created at: {output_path}")
@@ -1230,6 +1636,26 @@ def visualize_container(container, output_path):
         print(f"Error creating matplotlib container visualization: {e}", file=sys.stderr)
         return False
 
+class _ContainerView:
+    """The attributes of a Container that the visualizations draw, without its grids or index"""
+    __slots__ = ('container_id', 'width', 'depth', 'height', 'items')
+    
+    def __init__(self, container: Container):
+        self.container_id = container.container_id
+        self.width = container.width
+        self.depth = container.depth
+        self.height = container.height
+        self.items = container.items
+
+def _render_one(container: _ContainerView, output_path: str, cull_hidden: bool = False,
+                lod_threshold: int = LOD_ITEM_THRESHOLD, use_cache: bool = True) -> bool:
+    """Visualize one container (in worker processes), trying plotly first and falling back to matplotlib"""
+    if PLOTLY_AVAILABLE and visualize_container_plotly(container, container.items, output_path, cull_hidden=cull_hidden,
+                                                       lod_threshold=lod_threshold, use_cache=use_cache):
+        return True
+    # matplotlib cannot write HTML, so the fallback gets its own image next to the HTML path
+    return visualize_container(container, os.path.splitext(output_path)[0] + '.png')
+
 def main():
     """Main function for the 3D packing algorithm"""
     # Setup command line arguments
@@ -1239,6 +1665,12 @@ def main():
     parser.add_argument('output_dir', help='Output directory for results and visualizations')
     parser.add_argument('--enforce-zones', action='store_true', help='Enforce zone restrictions')
     parser.add_argument('--debug', action='store_true', help='Enable debug output')
+    parser.add_argument('--cull-hidden', action='store_true',
+                        help='Leave items enclosed by other items out of the visualization')
+    parser.add_argument('--lod-threshold', type=int, default=LOD_ITEM_THRESHOLD,
+                        help='Draw items as markers instead of boxes above this many items')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Build every container shell from scratch instead of reusing it for equal sizes')
     
     # Parse arguments
     try:
@@ -1252,28 +1684,32 @@ def main():
         print(f"Error parsing arguments: {e}")
         return False
     
-    # Determine if input is a file path or JSON string
+    # Placement search diagnostics go to stderr, and only with --debug
+    configure_logging(args.debug)
+    
+    # Determine if input is a file path or JSON string; anything longer than
+    # PATH_MAX can only be JSON, so it is never looked up on disk
     containers_data = []
     items_data = []
     
     # Parse containers data
-    if os.path.exists(args.containers_json):
-        with open(args.containers_json, 'r') as f:
-            containers_data = json.load(f)
+    if len(args.containers_json) < 4096 and os.path.isfile(args.containers_json):
+        with open(args.containers_json, 'rb') as f:
+            containers_data = loads_json(f.read())
     else:
         try:
-            containers_data = json.loads(args.containers_json)
+            containers_data = loads_json(args.containers_json)
         except:
             print(f"Error: Could not parse containers JSON: {args.containers_json[:100]}...")
             return False
     
     # Parse items data
-    if os.path.exists(args.items_json):
-        with open(args.items_json, 'r') as f:
-            items_data = json.load(f)
+    if len(args.items_json) < 4096 and os.path.isfile(args.items_json):
+        with open(args.items_json, 'rb') as f:
+            items_data = loads_json(f.read())
     else:
         try:
-            items_data = json.loads(args.items_json)
+            items_data = loads_json(args.items_json)
         except:
             print(f"Error: Could not parse items JSON: {args.items_json[:100]}...")
             return False
@@ -1317,26 +1753,38 @@ def main():
     
     results = packer.pack_items()
     
+    # Serialize the results once, for both the results file and stdout
+    results_json = dumps_json(results)
+    
     # Save results to file
     output_path = os.path.join(args.output_dir, 'placement_results.json')
-    with open(output_path, 'w') as f:
-        json.dump(results, f, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(results_json)
     
-    # Generate visualization if needed
+    # Generate visualizations if needed, one file per container
     if len(containers) > 0 and len(items) > 0:
-        container = containers[0]  # Just visualize the first container
-        vis_output_path = os.path.join(args.output_dir, 'visualization.html')
-        
-        # Try plotly first, fall back to matplotlib
-        if PLOTLY_AVAILABLE:
-            success = visualize_container_plotly(container, container.items, vis_output_path)
-            if not success:
-                visualize_container(container, vis_output_path)
+        render_jobs = [(_ContainerView(c), os.path.join(args.output_dir, f'visualization_{c.container_id}.html'))
+                       for c in containers]
+        
+        # Figures are built in pure Python, so each container renders as its own job in a worker
+        # process once there is enough work to pay for starting them. A worker's cached shell
+        # traces are reused for every later container of that size
+        if (len(render_jobs) > 1 and (os.cpu_count() or 1) >= 2 and
+                sum(len(c.items) for c in containers) >= PARALLEL_RENDER_MIN_ITEMS):
+            with _process_pool(len(render_jobs)) as executor:
+                futures = [executor.submit(_render_one, *job, args.cull_hidden, args.lod_threshold,
+                                           not args.no_cache)
+                           for job in render_jobs]
+                for future in futures:
+                    future.result()
         else:
-            visualize_container(container, vis_output_path)
+            for job in render_jobs:
+                _render_one(*job, args.cull_hidden, args.lod_threshold, not args.no_cache)
     
     # Print results to stdout for the Node.js process to capture
-    print(json.dumps(results))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(results_json + b'\n')
+    sys.stdout.flush()
     return True
 
 if __name__ == "__main__":